@@ -11,19 +11,108 @@ Arguments:
     frames_dir       : Folder containing JPEG frames  (default: "frames")
     --threshold N    : Max hash distance to consider two images "same"
                        0 = exact duplicates only, 10 = very similar (default: 5)
+    --window N       : Compare each frame to the next N frames, not just the
+                       adjacent one — catches duplicates across stutters (default: 1)
     --dry-run        : Print what would be deleted without actually deleting
 
 Examples:
     python deduplicate_frames.py
     python deduplicate_frames.py frames --threshold 8
     python deduplicate_frames.py frames --threshold 5 --dry-run
+    python deduplicate_frames.py frames --window 30
 """
 
 import os
 import sys
 import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import scipy.fft
 from PIL import Image
-import imagehash
+
+# Optional: libjpeg-turbo bindings roughly halve JPEG decode time vs stock
+# libjpeg.  Decode straight to grayscale (phash discards colour anyway) and
+# fall back to PIL when the library is missing or a file trips it up.
+try:
+    from turbojpeg import TurboJPEG, TJPF_GRAY
+    _turbo_local = threading.local()
+
+    def _get_turbojpeg():
+        # One instance per thread: TurboJPEG keeps libjpeg-turbo scratch state.
+        tj = getattr(_turbo_local, "tj", None)
+        if tj is None:
+            tj = _turbo_local.tj = TurboJPEG()
+        return tj
+except ImportError:
+    _get_turbojpeg = None
+
+# Optional: with JAX present (and ideally a GPU), hash frames in JIT-compiled
+# batches instead of one Python call per image.
+try:
+    import jax
+    import jax.numpy as jnp
+except ImportError:
+    jax = None
+
+JAX_BATCH = 256   # fixed batch size keeps the JIT specialised to one shape
+
+# How many thumbnails to push through one batched DCT call.
+DCT_BATCH = 256
+
+# Optional: phash always transforms a 32×32 array, so with pyFFTW we can
+# plan that one DCT-II shape once at import and re-execute the plan for
+# every image, instead of paying scipy's per-call setup.
+try:
+    import pyfftw
+    _dct_in = pyfftw.empty_aligned((32, 32), dtype="float64")
+    _dct_out = pyfftw.empty_aligned((32, 32), dtype="float64")
+    _dct_plan = pyfftw.FFTW(_dct_in, _dct_out, axes=(0, 1),
+                            direction=("FFTW_REDFT10", "FFTW_REDFT10"),
+                            flags=("FFTW_MEASURE",))
+    _dct_lock = threading.Lock()   # the plan's buffers are shared state
+except ImportError:
+    pyfftw = None
+
+
+def _hash_batch(thumbs: np.ndarray) -> np.ndarray:
+    """
+    phash a (K, 32, 32) stack of luma thumbnails → (K,) packed np.uint64.
+
+    The 2-D DCT runs over the whole stack at once: via the pre-planned
+    FFTW transform slice by slice when pyFFTW is present, otherwise as
+    two axis-wise `scipy.fft.dct` calls — pocketfft releases the GIL and
+    `workers=-1` spreads the batch axis across cores.
+    """
+    k = len(thumbs)
+    if pyfftw is not None:
+        lows = np.empty((k, 8, 8))
+        with _dct_lock:
+            for i in range(k):
+                _dct_in[:] = thumbs[i]
+                _dct_plan.execute()
+                lows[i] = _dct_out[:8, :8]
+    else:
+        d = scipy.fft.dct(thumbs, axis=1, workers=-1)
+        d = scipy.fft.dct(d, axis=2, workers=-1)
+        lows = d[:, :8, :8]
+    med = np.median(lows, axis=(1, 2), keepdims=True)
+    bits = lows > med
+    packed = np.packbits(bits.reshape(k, 64), axis=1)
+    return packed.view(">u8").ravel().astype(np.uint64)
+
+
+def _open_grayscale(path: str) -> Image.Image:
+    """Open an image for hashing, preferring the turbo-JPEG decoder."""
+    if _get_turbojpeg is not None:
+        try:
+            with open(path, "rb") as f:
+                arr = _get_turbojpeg().decode(f.read(), pixel_format=TJPF_GRAY)
+            return Image.fromarray(arr.squeeze(), "L")
+        except Exception:
+            pass  # odd colourspace / truncated file → let PIL try
+    return Image.open(path)
 
 
 def parse_args():
@@ -32,6 +121,8 @@ def parse_args():
                         help="Directory containing JPEG frames (default: frames)")
     parser.add_argument("--threshold", type=int, default=5,
                         help="Max perceptual hash distance to treat as duplicate (default: 5)")
+    parser.add_argument("--window", type=int, default=1,
+                        help="Number of following frames to compare against (default: 1 = adjacent only)")
     parser.add_argument("--dry-run", action="store_true",
                         help="Show what would be deleted without deleting")
     return parser.parse_args()
@@ -40,47 +131,219 @@ def parse_args():
 def load_jpeg_files(folder: str) -> list[str]:
     """Return sorted list of JPEG file paths in the given folder."""
     supported = {".jpg", ".jpeg"}
-    files = [
-        os.path.join(folder, f)
-        for f in sorted(os.listdir(folder))
-        if os.path.splitext(f)[1].lower() in supported
-    ]
-    return files
+    # scandir's DirEntry carries cached file-type info — no extra stat
+    # syscall per entry, which adds up on folders with 100k+ frames.
+    with os.scandir(folder) as it:
+        return sorted(
+            e.path for e in it
+            if e.is_file(follow_symlinks=False)
+            and os.path.splitext(e.name)[1].lower() in supported
+        )
+
+
+if jax is not None:
+    def _phash_jax(img):
+        """phash of one (32, 32) float32 luma image → (8, 8) bool array."""
+        d = jax.scipy.fft.dct(jax.scipy.fft.dct(img, axis=0), axis=1)
+        low = d[:8, :8]
+        return low > jnp.median(low)
 
+    _batch_phash = jax.jit(jax.vmap(_phash_jax))
 
-def compute_hashes(file_paths: list[str]) -> list[tuple[str, object]]:
-    """Compute perceptual hash for each image file."""
-    results = []
+
+def _compute_hashes_jax(file_paths: list[str]) -> tuple[list[str], np.ndarray]:
+    """
+    Batched variant of `compute_hashes`: stack 32×32 luma thumbnails into
+    (JAX_BATCH, 32, 32) arrays and run the DCT + median threshold as one
+    vmapped JIT call per batch.  The last batch is padded with its final
+    image so every call sees the same static shape.
+    """
+    paths: list[str] = []
+    chunks: list[np.ndarray] = []
     total = len(file_paths)
-    for i, path in enumerate(file_paths, 1):
-        print(f"  Hashing {i:>6}/{total} : {os.path.basename(path)}", end="\r")
+    batch_paths: list[str] = []
+    batch_imgs: list[np.ndarray] = []
+
+    def _flush():
+        if not batch_paths:
+            return
+        n = len(batch_paths)
+        while len(batch_imgs) < JAX_BATCH:
+            batch_imgs.append(batch_imgs[-1])
+        bits = np.asarray(_batch_phash(jnp.asarray(np.stack(batch_imgs))))
+        packed = np.packbits(bits[:n].reshape(n, 64), axis=1)
+        chunks.append(packed.view(">u8").ravel().astype(np.uint64))
+        paths.extend(batch_paths)
+        print(f"  Hashing {len(paths):>6}/{total}", end="\r")
+        batch_paths.clear()
+        batch_imgs.clear()
+
+    for path in file_paths:
         try:
-            img = Image.open(path)
-            h = imagehash.phash(img)   # perceptual hash (8×8 DCT)
-            results.append((path, h))
+            with _open_grayscale(path) as img:
+                thumb = img.convert("L").resize((32, 32), Image.LANCZOS)
+            batch_imgs.append(np.asarray(thumb, dtype=np.float32))
+            batch_paths.append(path)
         except Exception as e:
             print(f"\n  [WARN] Could not read {path}: {e}")
+            continue
+        if len(batch_paths) == JAX_BATCH:
+            _flush()
+    _flush()
     print()  # newline after progress
-    return results
+    hashes = (np.concatenate(chunks) if chunks
+              else np.empty(0, dtype=np.uint64))
+    return paths, hashes
 
 
-def find_duplicates(hashed: list[tuple[str, object]], threshold: int) -> set[str]:
+def compute_hashes(file_paths: list[str]) -> tuple[list[str], np.ndarray]:
+    """
+    Compute perceptual hash for each image file.
+
+    Returns parallel structures — a list of readable paths and a matching
+    np.uint64 array of packed 64-bit phashes.  Keeping the hashes in one
+    flat array (8 bytes each, no per-hash Python object) is what lets the
+    sweeps below run vectorized, and it keeps memory flat on huge frame
+    dumps.
+
+    With JAX available the DCTs run as JIT-compiled batches (on the GPU
+    when there is one).  Otherwise a thread pool loads and resizes the
+    thumbnails — JPEG decode (libjpeg) releases the GIL, so this scales
+    near-linearly with cores while `executor.map` keeps results in input
+    order (required by `find_duplicates`) — and `_hash_batch` then runs
+    the DCTs DCT_BATCH images at a time.  Unreadable files are dropped
+    from both structures.
+    """
+    if jax is not None:
+        return _compute_hashes_jax(file_paths)
+
+    total = len(file_paths)
+    counter = itertools.count(1)
+    lock = threading.Lock()
+
+    def _load_thumb(path: str) -> tuple[str, object]:
+        try:
+            with _open_grayscale(path) as img:
+                thumb = img.convert("L").resize((32, 32), Image.LANCZOS)
+        except Exception as e:
+            with lock:
+                print(f"\n  [WARN] Could not read {path}: {e}")
+            return path, None
+        done = next(counter)
+        with lock:
+            print(f"  Hashing {done:>6}/{total} : {os.path.basename(path)}", end="\r")
+        return path, np.asarray(thumb, dtype=np.float32)
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        loaded = [r for r in executor.map(_load_thumb, file_paths) if r[1] is not None]
+    print()  # newline after progress
+
+    paths = [p for p, _ in loaded]
+    chunks = [
+        _hash_batch(np.stack([t for _, t in loaded[start:start + DCT_BATCH]]))
+        for start in range(0, len(loaded), DCT_BATCH)
+    ]
+    hashes = (np.concatenate(chunks) if chunks
+              else np.empty(0, dtype=np.uint64))
+    return paths, hashes
+
+
+# Optional: numba compiles the sequential keep-last-distinct sweep to
+# native code with a hardware popcount, dropping per-frame cost from
+# Python-interpreter overhead (~200 ns) to a few cycles.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _sweep(hashes, threshold):
+        """Return indices into `hashes` of frames to delete."""
+        n = hashes.shape[0]
+        out = np.empty(n - 1, dtype=np.int64)
+        k = 0
+        kept = hashes[0]
+        for i in range(1, n):
+            x = hashes[i] ^ kept
+            # SWAR popcount — LLVM recognises the pattern and emits POPCNT
+            x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+            x = (x & np.uint64(0x3333333333333333)) + \
+                ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+            x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+            d = (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+            if d <= threshold:
+                out[k] = i
+                k += 1
+            else:
+                kept = hashes[i]
+        return out[:k]
+else:
+    _sweep = None
+
+
+# Hamming distance between packed hashes is popcount(XOR).  int.bit_count()
+# (3.10+) compiles to a single POPCNT; older interpreters count the bit string.
+try:
+    _popcount = int.bit_count
+except AttributeError:
+    def _popcount(x: int) -> int:
+        return bin(x).count("1")
+
+
+# Byte → number-of-set-bits table; indexing an ndarray of XOR bytes through
+# it is the classic SWAR popcount, and numpy runs the XOR/gather on SIMD lanes.
+POPCOUNT_LUT = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+
+
+def find_duplicates_windowed(paths: list[str], hashes: np.ndarray,
+                             threshold: int, window: int) -> set[str]:
+    """
+    Compare each kept frame to the next `window` frames, marking any within
+    `threshold` hash distance as duplicates.  Catches repeats separated by a
+    stutter frame that the adjacent-only sweep would reset on.
+    Returns the set of file paths to DELETE.
+    """
+    n = len(hashes)
+    bytes_view = hashes.view(np.uint8).reshape(n, 8)
+
+    to_delete: set[str] = set()
+    deleted = np.zeros(n, dtype=bool)
+    for i in range(n):
+        if deleted[i]:
+            continue
+        end = min(n, i + 1 + window)
+        if end <= i + 1:
+            break
+        xor = bytes_view[i] ^ bytes_view[i + 1:end]
+        dist = POPCOUNT_LUT[xor].sum(axis=1, dtype=np.uint16)
+        for j in np.nonzero(dist <= threshold)[0] + i + 1:
+            deleted[j] = True
+            to_delete.add(paths[j])
+    return to_delete
+
+
+def find_duplicates(paths: list[str], hashes: np.ndarray, threshold: int) -> set[str]:
     """
     Compare consecutive frames.  If two adjacent frames are within
     `threshold` hash distance, the later one is a duplicate.
     Returns the set of file paths to DELETE.
     """
     to_delete: set[str] = set()
-    kept_path, kept_hash = hashed[0]
 
-    for path, h in hashed[1:]:
-        distance = kept_hash - h
+    if _sweep is not None:
+        return {paths[i] for i in _sweep(hashes, threshold)}
+
+    kept_hash = int(hashes[0])
+    for i in range(1, len(hashes)):
+        h = int(hashes[i])
+        distance = _popcount(kept_hash ^ h)
         if distance <= threshold:
             # Too similar → mark for deletion
-            to_delete.add(path)
+            to_delete.add(paths[i])
         else:
             # Different enough → this becomes the new reference
-            kept_path, kept_hash = path, h
+            kept_hash = h
 
     return to_delete
 
@@ -111,11 +374,14 @@ def main():
 
     # ── Compute hashes ────────────────────────────────────────────────────
     print("[1/3] Computing perceptual hashes …")
-    hashed = compute_hashes(files)
+    paths, hashes = compute_hashes(files)
 
     # ── Find duplicates ───────────────────────────────────────────────────
     print("[2/3] Detecting duplicates …")
-    to_delete = find_duplicates(hashed, threshold)
+    if args.window > 1:
+        to_delete = find_duplicates_windowed(paths, hashes, threshold, args.window)
+    else:
+        to_delete = find_duplicates(paths, hashes, threshold)
 
     kept = len(files) - len(to_delete)
     print(f"\n  Unique frames to keep : {kept}")
@@ -14,9 +14,12 @@ Examples:
     python frames_to_ppt.py frames output.pptx --captions --bg-color 1a1a2e
 """
 
+import io
 import os
 import sys
 import argparse
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image as PILImage
 from pptx import Presentation
 from pptx.util import Inches, Pt, Emu
@@ -50,17 +53,95 @@ def collect_images(folder: str) -> list[str]:
     if not os.path.isdir(folder):
         print(f"[ERROR] Folder not found: {folder}")
         sys.exit(1)
-    files = sorted(
-        os.path.join(folder, f)
-        for f in os.listdir(folder)
-        if os.path.splitext(f)[1].lower() in SUPPORTED
-    )
+    # scandir avoids a stat syscall per entry (DirEntry caches file type)
+    with os.scandir(folder) as it:
+        files = sorted(
+            e.path for e in it
+            if e.is_file(follow_symlinks=False)
+            and os.path.splitext(e.name)[1].lower() in SUPPORTED
+        )
     if not files:
         print(f"[ERROR] No images found in: {folder}")
         sys.exit(1)
     return files
 
 
+def _jpeg_size(f) -> tuple[int, int] | None:
+    """Read (width, height) from JPEG headers without decoding any pixels."""
+    if f.read(2) != b"\xff\xd8":          # SOI
+        return None
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        while code == 0xFF:               # fill bytes before a marker
+            b = f.read(1)
+            if not b:
+                return None
+            code = b[0]
+        if 0xD0 <= code <= 0xD9:          # RSTn/SOI/EOI carry no payload
+            continue
+        (length,) = struct.unpack(">H", f.read(2))
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            # SOFn: precision(1) height(2) width(2)
+            _, h, w = struct.unpack(">BHH", f.read(5))
+            return w, h
+        f.seek(length - 2, 1)             # skip this segment's payload
+
+
+def _png_size(f) -> tuple[int, int] | None:
+    """Read (width, height) from the PNG IHDR chunk."""
+    header = f.read(24)
+    if (len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n"
+            or header[12:16] != b"IHDR"):
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def _probe_size(path: str, data: bytes) -> tuple[int, int]:
+    """
+    Return (width, height) of an in-memory image.
+
+    JPEG and PNG sizes come from a few header bytes via the parsers above
+    — no decoder, no PIL plugin dispatch.  Anything else (or a malformed
+    header) falls back to PIL.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext in (".jpg", ".jpeg"):
+            size = _jpeg_size(io.BytesIO(data))
+        elif ext == ".png":
+            size = _png_size(io.BytesIO(data))
+        else:
+            size = None
+    except struct.error:
+        size = None
+    if size is not None:
+        return size
+    with PILImage.open(io.BytesIO(data)) as im:
+        return im.size
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def prefetch_images(files: list[str]) -> list[bytes]:
+    """
+    Read every image's bytes up front, in parallel.
+
+    Each file is then touched exactly once: size probing happens on the
+    in-memory blob, and the same blob goes to python-pptx as a BytesIO —
+    without it `add_picture(path)` re-reads the file from disk for every
+    slide.  python-pptx content-hashes the blob, so repeated images still
+    land in the .pptx only once.
+    """
+    with ThreadPoolExecutor() as ex:
+        return list(ex.map(_read_bytes, files))
+
+
 def hex_to_rgb(hex_str: str) -> RGBColor:
     hex_str = hex_str.lstrip("#")
     r, g, b = int(hex_str[0:2], 16), int(hex_str[2:4], 16), int(hex_str[4:6], 16)
@@ -113,19 +194,18 @@ def add_title_slide(prs: Presentation, title_text: str, bg_color: RGBColor):
     run.font.color.rgb = RGBColor(0xFF, 0xFF, 0xFF)
 
 
-def add_image_slide(prs: Presentation, image_path: str,
-                    bg_color: RGBColor, captions: bool):
+def add_image_slide(prs: Presentation, image_path: str, data: bytes,
+                    size: tuple[int, int], bg_color: RGBColor, captions: bool):
     slide_layout = prs.slide_layouts[6]   # blank
     slide = prs.slides.add_slide(slide_layout)
     set_slide_background(slide, bg_color)
 
-    # Get natural image dimensions for aspect-ratio calc
-    with PILImage.open(image_path) as im:
-        img_w, img_h = im.size
+    # Natural image dimensions for aspect-ratio calc (probed from the blob)
+    img_w, img_h = size
 
     left, top, w, h = fit_image(img_w, img_h, SLIDE_W_IN, SLIDE_H_IN)
     slide.shapes.add_picture(
-        image_path,
+        io.BytesIO(data),
         Inches(left), Inches(top),
         Inches(w),    Inches(h)
     )
@@ -171,10 +251,12 @@ def main():
         add_title_slide(prs, args.title, bg_color)
         print(f"  ✔ Title slide added: \"{args.title}\"")
 
-    # One image per slide
-    for i, path in enumerate(files, 1):
+    # Prefetch image bytes in parallel, then one image per slide
+    blobs = prefetch_images(files)
+    for i, (path, data) in enumerate(zip(files, blobs), 1):
         print(f"  Adding slide {i:>4}/{len(files)} : {os.path.basename(path)}", end="\r")
-        add_image_slide(prs, path, bg_color, args.captions)
+        add_image_slide(prs, path, data, _probe_size(path, data),
+                        bg_color, args.captions)
 
     print(f"\n\n  Saving → {out_path} …")
     prs.save(out_path)
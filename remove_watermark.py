@@ -24,8 +24,9 @@ Usage
   # Control inpainting strength (default 5 px)
   python remove_watermark.py <image_or_folder> --coords 10 850 200 40 --radius 10
 
-  # Choose algorithm: telea (default) or ns
+  # Choose algorithm: telea (default), ns, or fast (cheap blur-fill)
   python remove_watermark.py <image_or_folder> --coords 10 850 200 40 --algo ns
+  python remove_watermark.py <image_or_folder> --coords 10 850 200 40 --algo fast
 
   # Save to a different folder
   python remove_watermark.py frames --coords 10 850 200 40 --out cleaned
@@ -34,6 +35,9 @@ Usage
 import os
 import sys
 import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 
@@ -46,8 +50,9 @@ def parse_args():
                    help="Watermark region: X Y Width Height (pixels from top-left)")
     p.add_argument("--radius", type=int, default=5,
                    help="Inpainting neighbourhood radius in pixels (default: 5)")
-    p.add_argument("--algo", choices=["telea", "ns"], default="telea",
-                   help="Inpainting algorithm: telea (default, fast) or ns (Navier-Stokes)")
+    p.add_argument("--algo", choices=["telea", "ns", "fast"], default="telea",
+                   help="Inpainting algorithm: telea (default), ns (Navier-Stokes), "
+                        "or fast (blur-fill — much cheaper, fine for opaque box watermarks)")
     p.add_argument("--out", default="cleaned",
                    help="Output folder when processing a batch (default: cleaned)")
     return p.parse_args()
@@ -65,11 +70,12 @@ def collect_images(input_path: str) -> list[str]:
     if os.path.isfile(input_path):
         return [input_path]
     if os.path.isdir(input_path):
-        return sorted(
-            os.path.join(input_path, f)
-            for f in os.listdir(input_path)
-            if is_image(os.path.join(input_path, f))
-        )
+        # scandir avoids a stat syscall per entry (DirEntry caches file type)
+        with os.scandir(input_path) as it:
+            return sorted(
+                e.path for e in it
+                if e.is_file(follow_symlinks=False) and is_image(e.name)
+            )
     print(f"[ERROR] Not a file or directory: {input_path}")
     sys.exit(1)
 
@@ -113,8 +119,41 @@ def build_mask(image: np.ndarray, x: int, y: int, w: int, h: int,
     return mask
 
 
+# In the batch case every frame shares the same size and region, so the
+# mask (a full H×W uint8 array) only needs to be built once.
+_mask_cache: dict[tuple, np.ndarray] = {}
+
+
+def get_mask(image: np.ndarray, x: int, y: int, w: int, h: int,
+             padding: int = 2) -> np.ndarray:
+    """Cached build_mask — rebuilds only when frame size or region changes."""
+    key = (image.shape[0], image.shape[1], x, y, w, h, padding)
+    mask = _mask_cache.get(key)
+    if mask is None:
+        mask = _mask_cache[key] = build_mask(image, x, y, w, h, padding)
+    return mask
+
+
+def blur_fill(image: np.ndarray, mask: np.ndarray, radius: int) -> np.ndarray:
+    """
+    Replace the masked region with the box-blurred surroundings.
+
+    No PDE solve — for an opaque logo in a known rectangle the result is
+    visually indistinguishable from real inpainting at a fraction of the
+    cost, since the blur pulls in the pixels around the mask border.
+    """
+    k = 2 * radius + 1
+    blurred = cv2.blur(image, (k, k))
+    result = image.copy()
+    region = mask > 0
+    result[region] = blurred[region]
+    return result
+
+
 def inpaint(image: np.ndarray, mask: np.ndarray,
             radius: int, algo: str) -> np.ndarray:
+    if algo == "fast":
+        return blur_fill(image, mask, radius)
     flag = cv2.INPAINT_TELEA if algo == "telea" else cv2.INPAINT_NS
     return cv2.inpaint(image, mask, radius, flag)
 
@@ -148,27 +187,47 @@ def process_images(files: list[str], coords: tuple | None,
     print(f"  Output folder    : {os.path.abspath(out_dir)}")
     print(f"  Images to process: {len(files)}\n")
 
-    ok, failed = 0, 0
-    for i, path in enumerate(files, 1):
-        print(f"  Processing {i:>5}/{len(files)} : {os.path.basename(path)}", end="\r")
+    # imread, inpaint and imwrite all release the GIL, so a thread pool
+    # scales this map across cores; capped to keep the disk from thrashing.
+    counter = itertools.count(1)
+    lock = threading.Lock()
+    total = len(files)
 
+    def _process_one(path: str) -> tuple[int, int]:
         img = cv2.imread(path)
         if img is None:
-            print(f"\n  [WARN] Cannot read: {path}")
-            failed += 1
-            continue
+            with lock:
+                print(f"\n  [WARN] Cannot read: {path}")
+            return 0, 1
 
         # Clamp region to actual image dimensions
         ih, iw = img.shape[:2]
         rx, ry = min(x, iw), min(y, ih)
         rw, rh = min(w, iw - rx), min(h, ih - ry)
 
-        mask = build_mask(img, rx, ry, rw, rh)
-        result = inpaint(img, mask, radius, algo)
+        # Inpaint only the watermark neighbourhood: the solver's cost scales
+        # with the pixels it sees, and pixels beyond a few radii of the mask
+        # cannot influence the reconstruction anyway.
+        margin = 4 * radius
+        x1c, y1c = max(0, rx - margin), max(0, ry - margin)
+        x2c, y2c = min(iw, rx + rw + margin), min(ih, ry + rh + margin)
+        roi = img[y1c:y2c, x1c:x2c]
+        mask = get_mask(roi, rx - x1c, ry - y1c, rw, rh)
+        img[y1c:y2c, x1c:x2c] = inpaint(np.ascontiguousarray(roi), mask, radius, algo)
 
         dest = output_path(path, input_root, out_dir)
-        cv2.imwrite(dest, result)
-        ok += 1
+        cv2.imwrite(dest, img)
+        done = next(counter)
+        with lock:
+            print(f"  Processing {done:>5}/{total} : {os.path.basename(path)}", end="\r")
+        return 1, 0
+
+    workers = min(os.cpu_count() or 1, 16)
+    ok, failed = 0, 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for n_ok, n_failed in executor.map(_process_one, files):
+            ok += n_ok
+            failed += n_failed
 
     print(f"\n\n[DONE] Processed {ok} image(s)  |  Failed: {failed}")
     print(f"[DONE] Clean images saved to: {os.path.abspath(out_dir)}")
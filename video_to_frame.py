@@ -1,23 +1,126 @@
 
+import io
 import os
 import sys
+import queue
+import tarfile
+import threading
+import time
 import cv2
+import numpy as np
 
-def read_video(video_path: str, output_dir: str = "frames", save_frames: bool = False):
+# Skipping the optimize-Huffman pass keeps the encoder fast; quality 90 is
+# visually lossless for frame dumps.
+JPEG_WRITE_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 90, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+JPEG_QUALITY = 90
+
+# Optional: libjpeg-turbo's SIMD DCT + Huffman encode is ~2× faster than the
+# stock libjpeg many OpenCV builds link against.  cv2 frames are already BGR,
+# which TurboJPEG takes natively.
+try:
+    from turbojpeg import TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+# How many encoder/writer threads to run behind the decode loop.
+WRITER_THREADS = min(os.cpu_count() or 1, 8)
+
+
+def _phash_ndarray(frame: "np.ndarray") -> int:
+    """
+    64-bit perceptual hash of a decoded BGR frame, packed into an int.
+
+    Same construction as imagehash.phash (grayscale → 32×32 → 2-D DCT →
+    top-left 8×8 block thresholded by its median) but computed straight
+    from the ndarray, so no JPEG round-trip is needed.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(small.astype(np.float32))
+    low = dct[:8, :8]
+    bits = (low > np.median(low)).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _cuda_decoder_available() -> bool:
+    """True when this OpenCV build can decode on an NVIDIA GPU (NVDEC)."""
+    try:
+        return (hasattr(cv2, "cudacodec")
+                and cv2.cuda.getCudaEnabledDeviceCount() > 0)
+    except cv2.error:
+        return False
+
+
+def _encode_jpeg(frame: "np.ndarray", tj) -> bytes:
+    """Encode one BGR frame to in-memory JPEG bytes."""
+    if tj is not None:
+        return tj.encode(frame, quality=JPEG_QUALITY)
+    return cv2.imencode(".jpg", frame, JPEG_WRITE_PARAMS)[1].tobytes()
+
+
+def _frame_writer(frame_queue: "queue.Queue", output_dir: str,
+                  tar: "tarfile.TarFile" = None, tar_lock: threading.Lock = None):
+    """
+    Drain (index, frame) pairs from the queue and write them as JPEGs.
+    Runs in a worker thread so the JPEG encode + disk write never stalls
+    the video decoder; a None item shuts the worker down.
+
+    With `tar` set, frames are appended to a single archive instead of
+    one file each — one inode and far fewer syscalls for long videos.
+    Encoding stays parallel; only the (cheap) tar append is serialised
+    behind `tar_lock`.
+    """
+    # One TurboJPEG per worker thread — the instance owns libjpeg-turbo
+    # scratch buffers and must not be shared across threads.
+    tj = TurboJPEG() if TurboJPEG is not None else None
+    while True:
+        item = frame_queue.get()
+        if item is None:
+            frame_queue.task_done()
+            break
+        idx, frame = item
+        name = f"frame_{idx:06d}.jpg"
+        if tar is not None:
+            buf = _encode_jpeg(frame, tj)
+            info = tarfile.TarInfo(name)
+            info.size = len(buf)
+            info.mtime = int(time.time())
+            with tar_lock:
+                tar.addfile(info, io.BytesIO(buf))
+        else:
+            filename = os.path.join(output_dir, name)
+            if tj is not None:
+                with open(filename, "wb") as f:
+                    f.write(tj.encode(frame, quality=JPEG_QUALITY))
+            else:
+                cv2.imwrite(filename, frame, JPEG_WRITE_PARAMS)
+        frame_queue.task_done()
+
+
+def read_video(video_path: str, output_dir: str = "frames", save_frames: bool = False,
+               dedup_threshold: int = None, tar_path: str = None):
     """
     Read a video file and optionally save its frames as images.
 
     Args:
-        video_path   : Path to the input video file.
-        output_dir   : Directory where extracted frames will be saved (if save_frames=True).
-        save_frames  : If True, each frame is saved as a JPEG image.
+        video_path      : Path to the input video file.
+        output_dir      : Directory where extracted frames will be saved (if save_frames=True).
+        save_frames     : If True, each frame is saved as a JPEG image.
+        dedup_threshold : If set, drop frames within this perceptual-hash
+                          distance of the last kept frame — deduplicates
+                          during decode instead of via a second pass over
+                          the written JPEGs (same semantics as
+                          deduplicate_frames.py).
+        tar_path        : If set, append the JPEGs to this tar archive
+                          instead of creating one file per frame.
     """
     if not os.path.isfile(video_path):
         print(f"[ERROR] Video file not found: {video_path}")
         sys.exit(1)
 
-    # Open the video file
-    cap = cv2.VideoCapture(video_path)
+    # Open the video file (FFmpeg backend; also used for metadata when
+    # decoding on the GPU below)
+    cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG)
 
     if not cap.isOpened():
         print(f"[ERROR] Could not open video file: {video_path}")
@@ -30,23 +133,59 @@ def read_video(video_path: str, output_dir: str = "frames", save_frames: bool =
     height       = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     duration_sec = total_frames / fps if fps > 0 else 0
 
+    # Offload H.264/HEVC decode to NVDEC when available, freeing the CPU
+    # cores for the JPEG encoder threads.
+    gpu_reader = None
+    if _cuda_decoder_available():
+        try:
+            gpu_reader = cv2.cudacodec.createVideoReader(video_path)
+            cap.release()
+        except cv2.error:
+            gpu_reader = None   # codec unsupported by NVDEC → stay on CPU
+
     print("=" * 50)
     print(f"  Video File   : {video_path}")
     print(f"  Resolution   : {width} x {height}")
     print(f"  FPS          : {fps:.2f}")
     print(f"  Total Frames : {total_frames}")
     print(f"  Duration     : {duration_sec:.2f} seconds")
+    print(f"  Decoder      : {'GPU (NVDEC)' if gpu_reader else 'CPU (FFmpeg)'}")
     print("=" * 50)
 
-    # ── Optional: create output directory ──────────────────────────────────
+    # ── Optional: create output directory / archive + writer pool ──────────
+    save_frames = save_frames or tar_path is not None
+    frame_queue = None
+    writers = []
+    tar = None
+    tar_lock = None
     if save_frames:
-        os.makedirs(output_dir, exist_ok=True)
-        print(f"  Saving frames to: {os.path.abspath(output_dir)}\n")
+        if tar_path is not None:
+            tar = tarfile.open(tar_path, "w", bufsize=8 * 1024 * 1024)
+            tar_lock = threading.Lock()
+            print(f"  Saving frames to: {os.path.abspath(tar_path)}\n")
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+            print(f"  Saving frames to: {os.path.abspath(output_dir)}\n")
+        # Bounded queue decouples decode (producer) from JPEG encode+write
+        # (consumers) so throughput is set by the slower stage, not the sum.
+        frame_queue = queue.Queue(maxsize=64)
+        for _ in range(WRITER_THREADS):
+            t = threading.Thread(target=_frame_writer,
+                                 args=(frame_queue, output_dir, tar, tar_lock),
+                                 daemon=True)
+            t.start()
+            writers.append(t)
 
     # ── Frame reading loop ─────────────────────────────────────────────────
     frame_index = 0
+    skipped = 0
+    kept_hash = None
     while True:
-        ret, frame = cap.read()
+        if gpu_reader is not None:
+            ret, gpu_frame = gpu_reader.nextFrame()
+            frame = gpu_frame.download() if ret else None
+        else:
+            ret, frame = cap.read()
 
         if not ret:
             # End of video or read error
@@ -54,34 +193,75 @@ def read_video(video_path: str, output_dir: str = "frames", save_frames: bool =
 
         print(f"  Reading frame {frame_index + 1:>6} / {total_frames}", end="\r")
 
-        if save_frames:
-            filename = os.path.join(output_dir, f"frame_{frame_index:06d}.jpg")
-            cv2.imwrite(filename, frame)
+        # Inline dedup: hash the decoded frame and skip near-duplicates
+        # before they ever reach the JPEG encoder or the disk.
+        write_frame = True
+        if dedup_threshold is not None:
+            h = _phash_ndarray(frame)
+            if kept_hash is not None and (h ^ kept_hash).bit_count() <= dedup_threshold:
+                write_frame = False
+                skipped += 1
+            else:
+                kept_hash = h
+
+        if save_frames and write_frame:
+            frame_queue.put((frame_index, frame))
 
         frame_index += 1
 
-    cap.release()
+    if gpu_reader is None:
+        cap.release()
+
+    # Flush the writer pool before reporting
+    if save_frames:
+        for _ in writers:
+            frame_queue.put(None)
+        for t in writers:
+            t.join()
+        if tar is not None:
+            tar.close()
     print(f"\n[DONE] Successfully read {frame_index} frames.")
+    if dedup_threshold is not None:
+        print(f"[DONE] Skipped {skipped} near-duplicate frames (threshold {dedup_threshold}).")
 
     if save_frames:
-        print(f"[DONE] Frames saved in: {os.path.abspath(output_dir)}")
+        dest = tar_path if tar_path is not None else output_dir
+        print(f"[DONE] Frames saved in: {os.path.abspath(dest)}")
 
 
 # ── Entry point ────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     # Usage:
-    #   python video_to_frame.py <video_path> [output_dir] [--save]
+    #   python video_to_frame.py <video_path> [output_dir] [--save] [--dedup [N]] [--tar frames.tar]
     #
     # Examples:
     #   python video_to_frame.py sample.mp4
     #   python video_to_frame.py sample.mp4 my_frames --save
+    #   python video_to_frame.py sample.mp4 my_frames --save --dedup 5
+    #   python video_to_frame.py sample.mp4 --tar frames.tar
 
     if len(sys.argv) < 2:
-        print("Usage: python video_to_frame.py <video_path> [output_dir] [--save]")
+        print("Usage: python video_to_frame.py <video_path> [output_dir] [--save] [--dedup [N]] [--tar frames.tar]")
         sys.exit(1)
 
     video_path = sys.argv[1]
     output_dir = sys.argv[2] if len(sys.argv) >= 3 and not sys.argv[2].startswith("--") else "frames"
     save_frames = "--save" in sys.argv
 
-    read_video(video_path, output_dir=output_dir, save_frames=save_frames)
+    dedup_threshold = None
+    if "--dedup" in sys.argv:
+        dedup_threshold = 5
+        i = sys.argv.index("--dedup")
+        if i + 1 < len(sys.argv) and sys.argv[i + 1].isdigit():
+            dedup_threshold = int(sys.argv[i + 1])
+
+    tar_path = None
+    if "--tar" in sys.argv:
+        i = sys.argv.index("--tar")
+        if i + 1 >= len(sys.argv) or sys.argv[i + 1].startswith("--"):
+            print("[ERROR] --tar requires an archive path, e.g. --tar frames.tar")
+            sys.exit(1)
+        tar_path = sys.argv[i + 1]
+
+    read_video(video_path, output_dir=output_dir, save_frames=save_frames,
+               dedup_threshold=dedup_threshold, tar_path=tar_path)